@@ -0,0 +1,343 @@
+import httpx
+import os
+import orjson
+import time
+import random
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Frappe API Configuration
+FRAPPE_URL = os.environ.get('FRAPPE_URL', 'https://app.besty.nz/api/resource/Product%20Item')
+FRAPPE_API_KEY = os.environ.get('FRAPPE_API_KEY', '32522add18495f4')
+FRAPPE_API_SECRET = os.environ.get('FRAPPE_API_SECRET', '45236bb4ab1dcc0')
+FRAPPE_METHOD_URL = os.environ.get('FRAPPE_METHOD_URL', 'https://app.besty.nz/api/method')
+FRAPPE_DOCTYPE = 'Product Item'
+# Optional CA bundle for self-signed Frappe hosts; certificates are always verified
+FRAPPE_CA_BUNDLE = os.environ.get('FRAPPE_CA_BUNDLE')
+
+# Number of concurrent Frappe writes; keep at or below the client's connection limit
+FRAPPE_WORKERS = int(os.environ.get('FRAPPE_WORKERS', 8))
+
+# Number of products sent per bulk request
+BATCH_SIZE = int(os.environ.get('FRAPPE_BATCH_SIZE', 50))
+
+# Products buffered between the scraper and the upload thread; producers block when it is full
+UPLOAD_QUEUE_SIZE = int(os.environ.get('FRAPPE_UPLOAD_QUEUE_SIZE', 256))
+# Seconds the upload thread waits for more products before sending a partial batch
+UPLOAD_LINGER = 0.5
+
+# Number of IDs checked per existence lookup, kept small enough for the query string
+EXISTS_CHUNK_SIZE = 100
+
+# Retry policy for transient failures
+MAX_RETRIES = 3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 1
+# Upper bound for a single backoff sleep, in seconds
+MAX_BACKOFF = 30
+
+def to_frappe_product(product):
+    """Map a scraped product onto the Frappe Product Item fields."""
+    # Extract necessary fields
+    product_id = product.get('id')
+    product_name = product.get('name')
+
+    # The trail ends with the product name; use the aisle (3rd entry) above it, or the
+    # deepest category there is when the trail stops at the department
+    product_categories = product.get('product_categories', [])
+    trail = product_categories[:-1]
+    category = trail[2] if len(trail) > 2 else (trail[1] if len(trail) > 1 else '')
+
+    return {
+        'product_id': product_id,  # Required field
+        'productname': product_name,  # Required field
+        'source_site': product.get('sourceSite'),
+        'size': product.get('size', ''),
+        'image_url': product.get('imageUrl'),
+        'unit_price': product.get('unitPrice'),
+        'unit_name': product.get('unitName'),
+        'original_unit_quantity': 1,  # Default value
+        'current_price': product.get('currentPrice'),
+        'price_history': '',  # You can populate this if needed
+        'last_updated': product.get('lastUpdated'),
+        'last_checked': product.get('lastChecked'),
+        'category': category,  # Include the 3rd category here
+        'product_categories': [{'category_name': category} for category in product_categories]  # Include all categories
+    }
+
+class FrappeClient:
+    """Client for the Frappe Product Item API sharing one HTTP/2 connection pool."""
+
+    def __init__(self, url=FRAPPE_URL, method_url=FRAPPE_METHOD_URL,
+                 api_key=FRAPPE_API_KEY, api_secret=FRAPPE_API_SECRET, workers=FRAPPE_WORKERS,
+                 ca_bundle=FRAPPE_CA_BUNDLE):
+        self.url = url
+        self.method_url = method_url
+        self.existing_ids = set()
+
+        # HTTP/2 lets concurrent writes share a connection instead of each holding one.
+        # The SSL context is built once here and reused by every pooled connection.
+        self.client = httpx.Client(
+            http2=True,
+            verify=ca_bundle or True,
+            headers={
+                'Authorization': f'token {api_key}:{api_secret}',
+                'Content-Type': 'application/json'
+            },
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+        )
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.client.close()
+
+    def _request(self, method, url, **kwargs):
+        """Send a request, retrying transient failures with full-jitter backoff."""
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                response = self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                logging.warning(f"{method} {url} failed ({e}), retrying")
+                time.sleep(random.uniform(0, min(MAX_BACKOFF, BACKOFF_BASE * 2 ** attempt)))
+                continue
+
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                return response
+
+            # Honour Retry-After when the server sends one, otherwise back off with jitter
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                delay = min(MAX_BACKOFF, int(retry_after))
+            else:
+                delay = random.uniform(0, min(MAX_BACKOFF, BACKOFF_BASE * 2 ** attempt))
+            logging.warning(f"{method} {url} returned {response.status_code}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    def exists_many(self, product_ids):
+        """Return which of the given product IDs already exist, checking up to 100 per call."""
+        found = set()
+        product_ids = list(product_ids)
+        for start in range(0, len(product_ids), EXISTS_CHUNK_SIZE):
+            chunk = product_ids[start:start + EXISTS_CHUNK_SIZE]
+            params = {
+                'fields': orjson.dumps(['name']).decode(),
+                'filters': orjson.dumps([['name', 'in', chunk]]).decode(),
+                'limit_page_length': 0
+            }
+            response = self._request('GET', self.url, params=params)
+            response.raise_for_status()
+            found.update(item['name'] for item in response.json().get('data', []))
+        self.existing_ids |= found
+        return found
+
+    def exists(self, product_id):
+        response = self._request('GET', f"{self.url}/{product_id}")
+        if response.status_code == 200:
+            return True, response.json()
+        elif response.status_code == 404:
+            return False, None
+        else:
+            logging.error(f"Error checking product existence: {response.status_code} - {response.content}")
+            return False, None
+
+    def update(self, product_id, product):
+        response = self._request('PUT', f"{self.url}/{product_id}", content=orjson.dumps(product))
+
+        try:
+            response.raise_for_status()
+            logging.info(f"Successfully updated product in Frappe: {product['productname']}")
+            return True
+        except httpx.HTTPStatusError as e:
+            logging.error(f"Failed to update product: {e}")
+            logging.error(f"Response content: {response.content}")
+            return False
+
+    def create(self, product):
+        response = self._request('POST', self.url, content=orjson.dumps(product))
+
+        try:
+            response.raise_for_status()
+            logging.info(f"Successfully created product in Frappe: {product['productname']}")
+            self.existing_ids.add(product['product_id'])
+            return True
+        except httpx.HTTPStatusError as e:
+            logging.error(f"Failed to create product: {e}")
+            logging.error(f"Response content: {response.content}")
+            return False
+
+    def upsert(self, product):
+        """Create or update a single Frappe product based on the known IDs."""
+        if product['product_id'] in self.existing_ids:
+            logging.info(f"Product {product['productname']} already exists. Updating...")
+            self.update(product['product_id'], product)
+        else:
+            logging.info(f"Product {product['productname']} does not exist. Creating new entry...")
+            self.create(product)
+
+    def insert_many(self, products):
+        """Create several products with a single frappe.client.insert_many call."""
+        docs = [{'doctype': FRAPPE_DOCTYPE, **product} for product in products]
+        response = self._request('POST', f"{self.method_url}/frappe.client.insert_many", content=orjson.dumps({'docs': docs}))
+
+        try:
+            response.raise_for_status()
+            logging.info(f"Successfully created {len(products)} products in Frappe")
+            self.existing_ids.update(product['product_id'] for product in products)
+            return True
+        except httpx.HTTPStatusError as e:
+            logging.error(f"Failed to create product batch: {e}")
+            logging.error(f"Response content: {response.content}")
+            return False
+
+    def bulk_update(self, products):
+        """Update several products with a single frappe.client.bulk_update call."""
+        docs = [{'doctype': FRAPPE_DOCTYPE, 'docname': product['product_id'], **product} for product in products]
+        # bulk_update json.loads its docs argument unconditionally, so send the list as a JSON string
+        response = self._request('POST', f"{self.method_url}/frappe.client.bulk_update",
+                                 content=orjson.dumps({'docs': orjson.dumps(docs).decode()}))
+
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            logging.error(f"Failed to update product batch: {e}")
+            logging.error(f"Response content: {response.content}")
+            return False
+
+        failed_docs = response.json().get('message', {}).get('failed_docs', [])
+        for failed in failed_docs:
+            logging.error(f"Failed to update product in Frappe: {failed}")
+        logging.info(f"Successfully updated {len(products) - len(failed_docs)} products in Frappe")
+        return len(failed_docs) == 0
+
+    def _create_chunk(self, chunk):
+        if self.insert_many(chunk):
+            return chunk
+        # One bad document fails the whole insert, so retry the chunk one by one
+        logging.warning(f"Bulk insert failed, creating {len(chunk)} products individually")
+        return [product for product in chunk if self.create(product)]
+
+    def _update_chunk(self, chunk):
+        if self.bulk_update(chunk):
+            return chunk
+        # Don't let one bad document discard the rest of the chunk
+        logging.warning(f"Bulk update failed, updating {len(chunk)} products individually")
+        return [product for product in chunk if self.update(product['product_id'], product)]
+
+    def flush(self, batch):
+        """Send a batch of Frappe products as concurrent bulk create/update calls."""
+        # Look up only the IDs this client hasn't already seen in Frappe
+        unknown = {product['product_id'] for product in batch} - self.existing_ids
+        if unknown:
+            self.exists_many(unknown)
+
+        to_create = [product for product in batch if product['product_id'] not in self.existing_ids]
+        to_update = [product for product in batch if product['product_id'] in self.existing_ids]
+
+        futures = []
+        for start in range(0, len(to_create), BATCH_SIZE):
+            futures.append(self.executor.submit(self._create_chunk, to_create[start:start + BATCH_SIZE]))
+        for start in range(0, len(to_update), BATCH_SIZE):
+            futures.append(self.executor.submit(self._update_chunk, to_update[start:start + BATCH_SIZE]))
+
+        done, _ = wait(futures)
+        written = []
+        for future in done:
+            if future.exception():
+                logging.error(f"Error sending product batch to Frappe: {future.exception()}")
+            else:
+                written.extend(future.result())
+        logging.info(f"Sent {len(written)}/{len(batch)} products to Frappe ({len(to_create)} new, {len(to_update)} existing)")
+        return written
+
+class FrappeUploader:
+    """Background thread that drains a bounded queue of Frappe products in bulk batches."""
+
+    _STOP = object()
+
+    def __init__(self, client, on_written=None, maxsize=UPLOAD_QUEUE_SIZE, batch_size=BATCH_SIZE):
+        self.client = client
+        self.on_written = on_written
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.thread = threading.Thread(target=self._run, name='frappe-uploader', daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def put(self, product):
+        """Queue a product for upload, blocking while the queue is full."""
+        self.queue.put(product)
+
+    def close(self):
+        """Send everything still queued, then stop the upload thread."""
+        self.queue.put(self._STOP)
+        self.thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            batch = []
+            # Gather up to a full batch, sending early once the producer goes quiet
+            while True:
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.queue.get(timeout=UPLOAD_LINGER)
+                except queue.Empty:
+                    break
+            if batch:
+                self._send(batch)
+
+    def _send(self, batch):
+        try:
+            written = self.client.flush(batch)
+            if self.on_written:
+                self.on_written(written)
+        except Exception as e:
+            logging.error(f"Error uploading {len(batch)} products to Frappe: {e}")
+
+if __name__ == "__main__":
+    # Example product to test with
+    mock_product = {
+        "id": "133211",
+        "sourceSite": "woolworths.co.nz",
+        "lastChecked": "2025-01-08T18:31:43.042304",
+        "lastUpdated": "2025-01-08T18:31:43.042304",
+        "name": "Fresh Fruit Bananas Yellow",
+        "size": "",
+        "imageUrl": "https://assets.woolworths.com.au/images/2010/133211.jpg?impolicy=wowcdxwbjbx&w=200&h=200",
+        "currentPrice": 3.45,
+        "unitPrice": 3.45,
+        "unitName": "kg",
+        "product_categories": ["Fruit & Veg", "Fruit", "Bananas", "Fresh Fruit Bananas Yellow"]
+    }
+
+    # Call the client to test writing to Frappe
+    with FrappeClient() as client:
+        product = to_frappe_product(mock_product)
+        client.exists_many([product['product_id']])
+        client.upsert(product)
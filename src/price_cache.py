@@ -0,0 +1,42 @@
+import sqlite3
+import threading
+
+class PriceCache:
+    """Local SQLite record of the last price sent to Frappe for each product."""
+
+    def __init__(self, path):
+        # Prices are recorded from the Frappe upload thread, so share the connection under a lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS prices ("
+            "product_id TEXT PRIMARY KEY, price REAL, last_updated TEXT)"
+        )
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def is_unchanged(self, product_id, price):
+        """Return True when the cached price matches the given one."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT price FROM prices WHERE product_id = ?", (product_id,)
+            ).fetchone()
+        return row is not None and row[0] == price
+
+    def record(self, rows):
+        """Store (product_id, price, last_updated) rows after a successful write."""
+        rows = list(rows)
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO prices (product_id, price, last_updated) VALUES (?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
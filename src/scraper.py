@@ -1,15 +1,26 @@
 import time
 import logging
+import functools
+import multiprocessing
+import multiprocessing.pool
+import multiprocessing.util
 import re
 import os
+import queue
+import signal
+import subprocess
 from datetime import datetime
+from urllib.parse import urlparse, urlencode, parse_qsl
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterator, Tuple
 from dataclasses import dataclass
-import json
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 
-from frappe_write import test_write_to_frappe
+from frappe_client import FrappeClient, FrappeUploader, to_frappe_product
+from price_cache import PriceCache
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -18,7 +29,89 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import *
 from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
+from lxml.cssselect import CSSSelector
+
+# Patterns used for every product entry, compiled once
+_WS = re.compile(r"\s+")
+_SIZE = re.compile(r"(tray\s\d+)|(\d+(\.\d+)?(\-\d+\.\d+)?\s?(g|kg|l|ml|pack))\b")
+_UNIT = re.compile(r"\$([\d.]+) / (\d+)(g|kg|ml|l)")
+_MEASURE = re.compile(r"(\d+)\s?(g|kg|ml|l)")
+# Breadcrumb items with a non-blank link/span, and the normalised text of the first such link/span
+_BREADCRUMB_ITEMS = etree.XPath("//cdx-breadcrumb//li[.//*[self::a or self::span][normalize-space()]]")
+_BREADCRUMB_TEXT = etree.XPath("normalize-space((.//*[self::a or self::span][normalize-space()])[1])")
+
+class _DigitsOnly(dict):
+    """str.translate table keeping ASCII 0-9 and deleting every other character."""
+
+    def __missing__(self, codepoint: int) -> None:
+        self[codepoint] = None
+        return None
+
+_KEEP_DIGITS = _DigitsOnly((ord(digit), digit) for digit in "0123456789")
+
+# CSS selectors translated to XPath once, rather than on every lookup
+SEL_CATEGORIES = CSSSelector("ul.ng-tns-c1842912979-7 li a.dasFacetHref", translator="html")
+SEL_ENTRIES = CSSSelector("cdx-card product-stamp-grid div.product-entry", translator="html")
+SEL_TITLE = CSSSelector("h3[id*='-title']", translator="html")
+SEL_IMG = CSSSelector("img[alt]", translator="html")
+SEL_PRODUCT_LINK = CSSSelector("a[href*='productdetails']", translator="html")
+SEL_PRICE = CSSSelector("product-price div h3", translator="html")
+SEL_PRICE_DOLLAR = CSSSelector("em", translator="html")
+SEL_PRICE_CENTS = CSSSelector("span", translator="html")
+SEL_UNIT_PRICE = CSSSelector("span.cupPrice", translator="html")
+# Rendered once a listing page's products are in the DOM
+PRODUCT_GRID_SELECTOR = "cdx-card product-stamp-grid"
+SEL_PAGE_LINKS = CSSSelector("cdx-pagination li a, ul.pagination li a", translator="html")
+
+def _select_one(selector: CSSSelector, element: lxml.html.HtmlElement) -> Optional[lxml.html.HtmlElement]:
+    """Return the first element matching a compiled selector, or None."""
+    matches = selector(element)
+    return matches[0] if matches else None
+
+def _split_name_size(title: str) -> Tuple[str, str]:
+    """Normalise a product title into its display name and the size it ends with, if any."""
+    raw_name_size = _WS.sub(" ", title.strip()).lower()
+    size_match = _SIZE.search(raw_name_size)
+    base_name = raw_name_size[:size_match.start()].strip() if size_match else raw_name_size
+    size = size_match.group(0).replace("l", "L").replace("tray", "Tray") if size_match else ""
+    return base_name.title(), size
+
+# Number of browser worker processes scraping categories in parallel
+SCRAPER_WORKERS = int(os.environ.get("SCRAPER_WORKERS", 4))
+# Categories dispatched to workers but not yet consumed by main(); bounds the finished
+# results waiting in the parent while it is blocked on Frappe uploads
+MAX_PENDING_CATEGORIES = int(os.environ.get("MAX_PENDING_CATEGORIES", SCRAPER_WORKERS * 2))
+# Seconds main() waits for a finished category before checking for workers that died mid-task
+LOST_TASK_POLL = 5
+
+# SQLite file holding the last price sent to Frappe per product
+PRICE_CACHE_PATH = os.environ.get("PRICE_CACHE_PATH", "cache.sqlite")
+
+# Chrome content settings: 2 = block
+CHROME_CONTENT_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.stylesheets": 2,
+    "profile.managed_default_content_settings.fonts": 2,
+    "profile.default_content_setting_values.notifications": 2
+}
+# Requests Chrome drops at the network layer, covering anything the content settings miss
+CHROME_BLOCKED_URLS = ["*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg", "*.css", "*.woff", "*.woff2", "*.ttf"]
+
+# JSON endpoint behind the Woolworths browse pages
+WOOLWORTHS_API_URL = "https://www.woolworths.co.nz/api/v1/products"
+WOOLWORTHS_API_PAGE_SIZE = 48
+WOOLWORTHS_PRODUCT_URL = "https://www.woolworths.co.nz/shop/productdetails?stockcode={sku}"
+WOOLWORTHS_API_HEADERS = {
+    "x-requested-with": "OnlineShopping.WebApp",
+    "user-agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "accept": "application/json"
+}
+# Concurrent plain-HTTP page fetches (listing pages and product detail pages)
+FETCH_WORKERS = int(os.environ.get("FETCH_WORKERS", 8))
+# Browse path depth -> dasFilter facet name
+WOOLWORTHS_FILTER_LEVELS = ["Department", "Aisle", "Shelf"]
 
 # Configure logging
 logging.basicConfig(
@@ -30,10 +123,10 @@ logging.basicConfig(
 class ScraperConfig:
     """Configuration settings for the scraper."""
     base_url: str
-    page_load_delay: int = 7
-    product_log_delay: float = 0.02
+    page_load_delay: int = 1
     max_retries: int = 3
     timeout: int = 20
+    fetch_product_details: bool = False
     chrome_options: List[str] = None
 
     def __post_init__(self):
@@ -41,9 +134,23 @@ class ScraperConfig:
             self.chrome_options = [
                 "--no-sandbox",
                 "--disable-dev-shm-usage",
-                "--start-maximized"
+                "--headless=new",
+                "--disable-gpu",
+                "--window-size=1920,1080",
+                "--blink-settings=imagesEnabled=false",
+                "--disable-extensions",
+                "--disable-background-networking",
+                "--log-level=3",
+                "--silent",
+                "--disable-logging",
+                "--disable-breakpad"
             ]
 
+@functools.lru_cache(maxsize=1)
+def _driver_path() -> str:
+    """Resolve the chromedriver binary once per process; forked workers inherit it."""
+    return ChromeDriverManager().install()
+
 class WebDriverManager:
     """Manages WebDriver initialization and cleanup."""
     
@@ -52,28 +159,59 @@ class WebDriverManager:
         options = Options()
         for option in config.chrome_options:
             options.add_argument(option)
+        # Only the DOM text is scraped, so skip downloading images, stylesheets and fonts
+        options.add_experimental_option("prefs", CHROME_CONTENT_PREFS)
+        # Return from driver.get at DOMContentLoaded; explicit waits cover the rest
+        options.page_load_strategy = "eager"
+        # Keep Chrome's own console logging off the driver's stderr
+        options.add_experimental_option("excludeSwitches", ["enable-logging"])
             
         try:
-            service = Service(ChromeDriverManager().install())
-            return webdriver.Chrome(service=service, options=options)
+            service = Service(
+                _driver_path(),
+                log_output=subprocess.DEVNULL,
+                service_args=["--log-level=OFF"]
+            )
+            driver = webdriver.Chrome(service=service, options=options)
         except Exception as e:
             logging.error(f"Error initializing WebDriver: {e}")
             return None
 
+        # URL blocking is only an optimisation, so a failure here keeps the running browser
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": CHROME_BLOCKED_URLS})
+        except Exception as e:
+            logging.warning(f"Could not block media requests via CDP: {e}")
+        return driver
+
 class BaseScraper(ABC):
     """Abstract base class for web scrapers."""
     
     def __init__(self, config: ScraperConfig):
         self.config = config
         self.driver = None
+        self.session = None
+        self.executor = None
+        self.current_category = []
+        self.current_url = None
+        # Shared lastChecked/lastUpdated timestamp, refreshed once per scrape pass
+        self._now_iso = datetime.now().isoformat()
         
     def __enter__(self):
         self.driver = WebDriverManager.get_driver(self.config)
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=FETCH_WORKERS))
+        self.executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS)
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.executor:
+            self.executor.shutdown(wait=True)
         if self.driver:
             self.driver.quit()
+        if self.session:
+            self.session.close()
 
     @abstractmethod
     def fetch_categories(self) -> List[Dict[str, str]]:
@@ -81,8 +219,8 @@ class BaseScraper(ABC):
         pass
 
     @abstractmethod
-    def extract_product_data(self, entry: BeautifulSoup, **kwargs) -> Optional[Dict]:
-        """Extract product data from a BeautifulSoup element."""
+    def extract_product_data(self, entry: lxml.html.HtmlElement, **kwargs) -> Optional[Dict]:
+        """Extract product data from a parsed HTML element."""
         pass
 
     def wait_for_element(self, by: By, selector: str, timeout: Optional[int] = None) -> bool:
@@ -100,7 +238,9 @@ class BaseScraper(ABC):
         for attempt in range(self.config.max_retries):
             try:
                 self.driver.get(url)
-                time.sleep(self.config.page_load_delay)
+                # Continue as soon as page content renders rather than sleeping a fixed delay
+                if not self.wait_for_element(By.CSS_SELECTOR, f"{PRODUCT_GRID_SELECTOR}, cdx-search-filters, cdx-breadcrumb"):
+                    logging.warning(f"Timed out waiting for content on {url}")
                 return True
             except Exception as e:
                 logging.error(f"Error accessing {url} (attempt {attempt + 1}): {e}")
@@ -108,46 +248,107 @@ class BaseScraper(ABC):
                     return False
                 time.sleep(self.config.page_load_delay)
 
-    def get_page_source(self) -> Optional[BeautifulSoup]:
-        """Get the current page source as BeautifulSoup object."""
+    def load_listing(self, url: str) -> bool:
+        """Navigate to a listing page and wait for its product grid specifically."""
+        if not self.safe_get(url):
+            return False
+        # Filters and breadcrumbs render before the products, so they don't mean the grid is ready
+        if not self.wait_for_element(By.CSS_SELECTOR, PRODUCT_GRID_SELECTOR):
+            logging.warning(f"No product grid rendered on {url}")
+        return True
+
+    def get_page_source(self) -> Optional[lxml.html.HtmlElement]:
+        """Get the current page source as a parsed lxml tree."""
         try:
-            return BeautifulSoup(self.driver.page_source, "html.parser")
+            return lxml.html.fromstring(self.driver.page_source)
         except Exception as e:
             logging.error(f"Error getting page source: {e}")
             return None
 
-    def scrape_products(self, url: str) -> List[Dict]:
-        """Scrape all products from a given URL."""
-        if not self.safe_get(url):
-            return []
-
-        products = []
-        current_page = 1
-        
-        while True:
-            soup = self.get_page_source()
-            if not soup:
-                break
+    def fetch_page_tree(self, url: str) -> Optional[lxml.html.HtmlElement]:
+        """Fetch a page over plain HTTP and parse it, without the browser."""
+        try:
+            response = self.session.get(url, headers={"accept": "text/html"}, timeout=self.config.timeout)
+            response.raise_for_status()
+            return lxml.html.fromstring(response.text)
+        except (requests.RequestException, etree.ParserError) as e:
+            logging.error(f"Error fetching {url}: {e}")
+            return None
 
-            product_entries = self.find_product_entries(soup)
+    def category_trail(self, url: str, category_name: Optional[str] = None) -> List[str]:
+        """Build the category hierarchy for a listing URL."""
+        return [category_name] if category_name else []
+
+    def get_last_page_number(self, tree: lxml.html.HtmlElement) -> Optional[int]:
+        """Return the number of listing pages, or None if pagination can't be read."""
+        return None
+
+    def page_url(self, url: str, page: int) -> str:
+        """Build the URL of a given listing page."""
+        parts = urlparse(url)
+        query = dict(parse_qsl(parts.query))
+        query["page"] = str(page)
+        return parts._replace(query=urlencode(query)).geturl()
+
+    def scrape_products(self, url: str, category_name: Optional[str] = None) -> Iterator[Dict]:
+        """Scrape all products from a given URL, yielding them as they are parsed."""
+        self.current_category = self.category_trail(url, category_name)
+        self.current_url = url
+        self._now_iso = datetime.now().isoformat()
+        if not self.load_listing(url):
+            return
+
+        tree = self.get_page_source()
+        if tree is None:
+            return
+        product_entries = self.find_product_entries(tree)
+        if not product_entries:
+            return
+        yield from self.page_products(product_entries)
+
+        last_page = self.get_last_page_number(tree)
+        if last_page is None:
+            # Pagination isn't readable, so click through the pages in the browser
+            while self.goto_next_page():
+                tree = self.get_page_source()
+                if tree is None:
+                    break
+                product_entries = self.find_product_entries(tree)
+                if not product_entries:
+                    break
+                yield from self.page_products(product_entries)
+            return
+
+        # Fetch the remaining pages concurrently over HTTP
+        page_urls = [self.page_url(url, page) for page in range(2, last_page + 1)]
+        for page_url, tree in zip(page_urls, self.executor.map(self.fetch_page_tree, page_urls)):
+            product_entries = self.find_product_entries(tree) if tree is not None else []
             if not product_entries:
-                break
-
-            for entry in product_entries:
-                product = self.extract_product_data(entry)
-                if product:
-                    products.append(product)
-                    time.sleep(self.config.product_log_delay)
+                # The page needs JavaScript to render its products; load it in the browser
+                if not self.load_listing(page_url):
+                    continue
+                tree = self.get_page_source()
+                if tree is None:
+                    continue
+                product_entries = self.find_product_entries(tree)
+            yield from self.page_products(product_entries)
+
+    def page_products(self, product_entries: List[Any]) -> Iterator[Dict]:
+        """Extract and yield the products from one listing page."""
+        products = []
+        for entry in product_entries:
+            product = self.extract_product_data(entry)
+            if product:
+                products.append(product)
 
-            if not self.goto_next_page():
-                break
-                
-            current_page += 1
+        yield from self.complete_page(products)
 
+    def complete_page(self, products: List[Dict]) -> List[Dict]:
+        """Hook to enrich a page of extracted products before they are yielded."""
         return products
 
     @abstractmethod
-    def find_product_entries(self, soup: BeautifulSoup) -> List[Any]:
+    def find_product_entries(self, tree: lxml.html.HtmlElement) -> List[Any]:
         """Find all product entries on the current page."""
         pass
 
@@ -159,6 +360,105 @@ class BaseScraper(ABC):
 class WoolworthsScraper(BaseScraper):
     """Woolworths specific implementation of the BaseScraper."""
 
+    def __init__(self, config: ScraperConfig):
+        super().__init__(config)
+        # Shelf URL -> breadcrumb trail shared by every product on it (minus the product name)
+        self._breadcrumb_cache: Dict[str, List[str]] = {}
+
+    def __enter__(self):
+        super().__enter__()
+        self.session.headers.update(WOOLWORTHS_API_HEADERS)
+        return self
+
+    def scrape_products(self, url: str, category_name: Optional[str] = None) -> Iterator[Dict]:
+        """Scrape products through the JSON API, falling back to Selenium."""
+        self.current_category = self.category_trail(url, category_name)
+        self.current_url = url
+        self._now_iso = datetime.now().isoformat()
+        yielded = 0
+        try:
+            for product in self.scrape_products_api(url):
+                yielded += 1
+                yield product
+            return
+        except (ValueError, requests.RequestException, KeyError) as e:
+            if yielded:
+                logging.error(f"Product API failed after {yielded} products from {url}: {e}")
+                return
+            logging.warning(f"Product API unavailable for {url} ({e}), falling back to browser scraping")
+
+        yield from super().scrape_products(url, category_name)
+
+    def scrape_products_api(self, url: str) -> Iterator[Dict]:
+        """Page through the product search API for a browse URL."""
+        path = urlparse(url).path.strip("/").split("/")
+        if path[:2] != ["shop", "browse"] or not 3 <= len(path) <= 2 + len(WOOLWORTHS_FILTER_LEVELS):
+            raise ValueError(f"Not a browse category URL: {url}")
+        path = path[2:]
+        level = WOOLWORTHS_FILTER_LEVELS[len(path) - 1]
+        params = {
+            "target": "browse",
+            "inStockProductsOnly": "false",
+            "size": WOOLWORTHS_API_PAGE_SIZE,
+            "dasFilter": f"{level};;{path[-1]};false"
+        }
+
+        page = 1
+        while True:
+            response = self.session.get(WOOLWORTHS_API_URL, params={**params, "page": page}, timeout=self.config.timeout)
+            response.raise_for_status()
+            results = orjson.loads(response.content)["products"]
+
+            items = [item for item in results.get("items", []) if item.get("type") == "Product"]
+            if page == 1 and not items:
+                # A filter the API doesn't recognise comes back as an empty 200, not an error
+                raise ValueError("first page had no products")
+
+            products = []
+            for item in items:
+                product = self.extract_api_product(item)
+                if product:
+                    products.append(product)
+            yield from self.complete_page(products)
+
+            if page * WOOLWORTHS_API_PAGE_SIZE >= results.get("totalItems", 0):
+                break
+            page += 1
+
+    def extract_api_product(self, item: Dict) -> Optional[Dict]:
+        """Map a product from the search API onto the scraped product shape."""
+        try:
+            name, title_size = _split_name_size(item.get("name", ""))
+            product = {
+                "id": str(item["sku"]),
+                "sourceSite": "woolworths.co.nz",
+                "lastChecked": self._now_iso,
+                "lastUpdated": self._now_iso,
+                "name": name,
+                "size": (item.get("size") or {}).get("volumeSize") or title_size,
+                # Detail page URL; complete_page fetches full breadcrumbs from it when enabled
+                "productUrl": WOOLWORTHS_PRODUCT_URL.format(sku=item["sku"])
+            }
+
+            images = item.get("images") or {}
+            if images.get("big"):
+                product["imageUrl"] = images["big"]
+
+            price = item.get("price") or {}
+            if price.get("salePrice") is not None:
+                product["currentPrice"] = float(price["salePrice"])
+
+            size = item.get("size") or {}
+            measure_match = _MEASURE.match((size.get("cupMeasure") or "").lower())
+            if size.get("cupPrice") and measure_match:
+                self._set_unit_price(float(size["cupPrice"]), int(measure_match.group(1)), measure_match.group(2), product)
+
+            product["product_categories"] = self.current_category + [product["name"]]
+            return product
+        except Exception as e:
+            logging.error(f"Error extracting API product data: {e}")
+            return None
+
     def fetch_categories(self) -> List[Dict[str, str]]:
         if not self.safe_get(self.config.base_url):
             return []
@@ -166,15 +466,15 @@ class WoolworthsScraper(BaseScraper):
         if not self.wait_for_element(By.CSS_SELECTOR, "cdx-search-filters"):
             return []
 
-        soup = self.get_page_source()
-        if not soup:
+        tree = self.get_page_source()
+        if tree is None:
             return []
 
-        categories_list = soup.select("ul.ng-tns-c1842912979-7 li a.dasFacetHref")
+        categories_list = SEL_CATEGORIES(tree)
         
         categories = []
         for category_element in categories_list:
-            category_name = category_element.text.strip().split(" (", 1)[0]
+            category_name = category_element.text_content().strip().split(" (", 1)[0]
             category_url = category_element.get("href")
             if category_url:
                 categories.append({
@@ -184,34 +484,77 @@ class WoolworthsScraper(BaseScraper):
 
         return categories
 
-    def fetch_product_page(self, url: str) -> BeautifulSoup:
-        self.driver.get(url)
-        time.sleep(5)  # Wait for the page to load completely
-        return BeautifulSoup(self.driver.page_source, "html.parser")
+    def category_trail(self, url: str, category_name: Optional[str] = None) -> List[str]:
+        # Browse URLs mirror the breadcrumbs, e.g. /shop/browse/fruit-veg/fruit/bananas
+        path = urlparse(url).path.strip("/").split("/")
+        slugs = path[2:] if path[:2] == ["shop", "browse"] else []
+        trail = ["Home"]
+        if slugs:
+            trail.append(category_name or slugs[0].replace("-", " ").title())
+            trail.extend(slug.replace("-", " ").title() for slug in slugs[1:])
+        elif category_name:
+            trail.append(category_name)
+        return trail
+
+    def fetch_breadcrumbs(self, url: str) -> List[str]:
+        """Fetch a product page over HTTP and return its breadcrumbs."""
+        logging.info(f"Fetching product page: {url}")
+        tree = self.fetch_page_tree(url)
+        return self.extract_breadcrumbs(tree) if tree is not None else []
+
+    def complete_page(self, products: List[Dict]) -> List[Dict]:
+        if not self.config.fetch_product_details:
+            return products
+
+        if not self._is_shelf_url(self.current_url):
+            # Department and aisle listings mix products from several shelves, so every
+            # product needs its own breadcrumbs; fetch the page's detail pages concurrently
+            with_urls = [product for product in products if product.get("productUrl")]
+            breadcrumbs = self.executor.map(self.fetch_breadcrumbs, [product["productUrl"] for product in with_urls])
+            for product, breadcrumb_info in zip(with_urls, breadcrumbs):
+                if breadcrumb_info:
+                    product['product_categories'] = breadcrumb_info
+                else:
+                    logging.warning(f"No breadcrumbs found for product: {product['name']}")
+            return products
+
+        # Every product on a shelf shares the breadcrumb trail up to its own name,
+        # so only the first product with a detail page is fetched per shelf
+        prefix = self._breadcrumb_cache.get(self.current_url)
+        if prefix is None:
+            for product in products:
+                if not product.get("productUrl"):
+                    continue
+                breadcrumb_info = self.fetch_breadcrumbs(product["productUrl"])
+                if breadcrumb_info:
+                    prefix = self._breadcrumb_cache[self.current_url] = breadcrumb_info[:-1]
+                    break
+                logging.warning(f"No breadcrumbs found for product: {product['name']}")
+            else:
+                return products
+
+        for product in products:
+            product['product_categories'] = prefix + [product['name']]
+        return products
+
+    @staticmethod
+    def _is_shelf_url(url: Optional[str]) -> bool:
+        """Whether a browse URL is at the deepest (shelf) level of the category tree."""
+        path = urlparse(url or "").path.strip("/").split("/")
+        return path[:2] == ["shop", "browse"] and len(path) == 2 + len(WOOLWORTHS_FILTER_LEVELS)
 
-    def extract_breadcrumbs(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
+    def extract_breadcrumbs(self, tree: lxml.html.HtmlElement) -> List[str]:
         product_categories = []
         try:
-            logging.debug(f"HTML content: {soup.prettify()}")
-            
-            breadcrumb_container = soup.find('cdx-breadcrumb')
-            if not breadcrumb_container:
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug("HTML content: %s", lxml.html.tostring(tree, encoding="unicode"))
+
+            # One name per breadcrumb item, Home included
+            product_categories = [_BREADCRUMB_TEXT(item) for item in _BREADCRUMB_ITEMS(tree)]
+            if not product_categories:
                 logging.warning("Breadcrumb container not found")
                 return product_categories
 
-            breadcrumb_items = breadcrumb_container.find_all('li')
-            
-            for item in breadcrumb_items:
-                # Check for anchor tags first
-                link = item.find('a')
-                if link and link.text.strip():
-                    product_categories.append({"category_name": link.text.strip()})
-                # If no anchor tag, check for span (last item)
-                else:
-                    span = item.find('span')
-                    if span and span.text.strip():
-                        product_categories.append({"category_name": span.text.strip()})
-
             # Log the extracted categories
             logging.info(f"Extracted product categories: {product_categories}")
             return product_categories
@@ -220,33 +563,25 @@ class WoolworthsScraper(BaseScraper):
             logging.error(f"Error extracting breadcrumbs: {str(e)}")
             return product_categories
 
-    def extract_product_data(self, entry: BeautifulSoup, **kwargs) -> Optional[Dict]:
+    def extract_product_data(self, entry: lxml.html.HtmlElement, **kwargs) -> Optional[Dict]:
         try:
-            h3_element = entry.select_one("h3[id*='-title']")
-            if not h3_element:
+            h3_element = _select_one(SEL_TITLE, entry)
+            if h3_element is None:
                 return None
 
             product = {
-                "id": re.sub(r"\D", "", h3_element.get("id", "")),
+                "id": h3_element.get("id", "").translate(_KEEP_DIGITS),
                 "sourceSite": "woolworths.co.nz",
-                "lastChecked": datetime.now().isoformat(),
-                "lastUpdated": datetime.now().isoformat()
+                "lastChecked": self._now_iso,
+                "lastUpdated": self._now_iso
             }
 
             # Extract name and size
-            raw_name_size = h3_element.text.strip().lower()
-            raw_name_size = re.sub(r"\s+", " ", raw_name_size)
-            size_match = re.search(r"(tray\s\d+)|(\d+(\.\d+)?(\-\d+\.\d+)?\s?(g|kg|l|ml|pack))\b", raw_name_size)
-            if size_match:
-                product["name"] = raw_name_size[:size_match.start()].strip().title()
-                product["size"] = size_match.group(0).replace("l", "L").replace("tray", "Tray")
-            else:
-                product["name"] = raw_name_size.title()
-                product["size"] = ""
+            product["name"], product["size"] = _split_name_size(h3_element.text_content())
 
             # Extract image URL
-            img_element = entry.select_one("img[alt]")
-            if img_element:
+            img_element = _select_one(SEL_IMG, entry)
+            if img_element is not None:
                 product["imageUrl"] = img_element.get("src")
 
             # Extract price
@@ -255,62 +590,61 @@ class WoolworthsScraper(BaseScraper):
 
             logging.info(f"Fetching product: {product['name']}")
 
-            # Navigate to individual product page and extract breadcrumbs
-            product_url = entry.select_one("a[href*='productdetails']")
-            if product_url and 'href' in product_url.attrs:
-                full_product_url = f"https://www.woolworths.co.nz{product_url['href']}"
-                try:
-                    logging.info(f"Fetching product page: {full_product_url}")
-                    product_page = self.fetch_product_page(full_product_url)
-                    breadcrumb_info = self.extract_breadcrumbs(product_page)
-                    
-                    if breadcrumb_info:
-                        product['product_categories'] = [category['category_name'] for category in breadcrumb_info]  # Store as a list
-                        logging.info(f"Successfully added breadcrumbs for {product['name']}")
-                    else:
-                        logging.warning(f"No breadcrumbs found for product: {product['name']}")
-                except Exception as e:
-                    logging.error(f"Error fetching product page: {e}")
+            # The listing's category path already gives the breadcrumbs
+            product['product_categories'] = self.current_category + [product['name']]
+
+            # Detail page URL; complete_page fetches full breadcrumbs from it when enabled
+            product_url = _select_one(SEL_PRODUCT_LINK, entry)
+            if product_url is not None and product_url.get('href'):
+                product["productUrl"] = f"https://www.woolworths.co.nz{product_url.get('href')}"
 
             return product
         except Exception as e:
             logging.error(f"Error extracting product data: {e}")
             return None
 
-    def _extract_price(self, entry: BeautifulSoup, product: Dict) -> None:
-        price_element = entry.select_one("product-price div h3")
-        if price_element:
-            dollar_element = price_element.select_one("em")
-            cent_element = price_element.select_one("span")
-            if dollar_element and cent_element:
-                cent_text = re.sub(r"\D", "", cent_element.text.strip())
-                product["currentPrice"] = float(f"{dollar_element.text}{'.' if cent_text else ''}{cent_text or '00'}")
-
-    def _extract_unit_price(self, entry: BeautifulSoup, product: Dict) -> None:
-        unit_price_element = entry.select_one("span.cupPrice")
-        if unit_price_element:
-            raw_unit_price = unit_price_element.text.strip()
-            unit_price_match = re.match(r"\$([\d.]+) \/ (\d+(g|kg|ml|l))", raw_unit_price)
+    def _extract_price(self, entry: lxml.html.HtmlElement, product: Dict) -> None:
+        price_element = _select_one(SEL_PRICE, entry)
+        if price_element is not None:
+            dollar_element = _select_one(SEL_PRICE_DOLLAR, price_element)
+            cent_element = _select_one(SEL_PRICE_CENTS, price_element)
+            if dollar_element is not None and cent_element is not None:
+                cent_text = cent_element.text_content().strip().translate(_KEEP_DIGITS)
+                product["currentPrice"] = float(f"{dollar_element.text_content()}{'.' if cent_text else ''}{cent_text or '00'}")
+
+    def _extract_unit_price(self, entry: lxml.html.HtmlElement, product: Dict) -> None:
+        unit_price_element = _select_one(SEL_UNIT_PRICE, entry)
+        if unit_price_element is not None:
+            raw_unit_price = unit_price_element.text_content().strip()
+            unit_price_match = _UNIT.match(raw_unit_price)
             if unit_price_match:
                 self._process_unit_price(unit_price_match, product)
 
     def _process_unit_price(self, match: re.Match, product: Dict) -> None:
-        unit_price = float(match.group(1))
-        unit = match.group(2)[-2:]
-        
+        self._set_unit_price(float(match.group(1)), int(match.group(2)), match.group(3), product)
+
+    def _set_unit_price(self, unit_price: float, quantity: int, unit: str, product: Dict) -> None:
+        # Normalise "$x / 100g" style prices to a price per kg or L
+        unit_price /= quantity or 1
         if unit == "g":
             unit = "kg"
             unit_price *= 1000
         elif unit == "ml":
             unit = "L"
             unit_price *= 1000
+        elif unit == "l":
+            unit = "L"
 
         product["unitPrice"] = unit_price
         product["unitName"] = unit
 
 
-    def find_product_entries(self, soup: BeautifulSoup) -> List[Any]:
-        return soup.select("cdx-card product-stamp-grid div.product-entry")
+    def find_product_entries(self, tree: lxml.html.HtmlElement) -> List[Any]:
+        return SEL_ENTRIES(tree)
+
+    def get_last_page_number(self, tree: lxml.html.HtmlElement) -> Optional[int]:
+        pages = [int(text) for text in (link.text_content().strip() for link in SEL_PAGE_LINKS(tree)) if text.isdigit()]
+        return max(pages) if pages else None
 
     def goto_next_page(self) -> bool:
         try:
@@ -321,55 +655,197 @@ class WoolworthsScraper(BaseScraper):
             if not next_button.is_displayed() or 'disabled' in next_button.get_attribute('class'):
                 return False
 
+            # Remember the current first card so we can tell when the next page has replaced it
+            cards = self.driver.find_elements(By.CSS_SELECTOR, "cdx-card")
+            prev_first_card = cards[0] if cards else None
+
             self.driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
-            time.sleep(1)
             self.driver.execute_script("arguments[0].click();", next_button)
-            time.sleep(self.config.page_load_delay)
+
+            if prev_first_card is not None:
+                WebDriverWait(self.driver, self.config.timeout).until(EC.staleness_of(prev_first_card))
+            self.wait_for_element(By.CSS_SELECTOR, PRODUCT_GRID_SELECTOR)
             
             return True
         except Exception as e:
             logging.error(f"Error navigating to next page: {e}")
             return False
 
+def record_prices(price_cache: PriceCache, written: List[Dict]) -> None:
+    """Remember the prices of products that were written to Frappe."""
+    price_cache.record(
+        (product['product_id'], product['current_price'], product['last_updated'])
+        for product in written
+    )
+
+# Per-process scraper owned by each pool worker
+_worker_scraper: Optional[BaseScraper] = None
+# Shared queue on which workers report (task_id, pid) as they start a category
+_task_starts: Optional[multiprocessing.Queue] = None
+
+def _init_worker(config: ScraperConfig, task_starts: multiprocessing.Queue) -> None:
+    """Start one long-lived browser per pool worker, closed when the worker exits."""
+    global _worker_scraper, _task_starts
+    _task_starts = task_starts
+    _worker_scraper = WoolworthsScraper(config).__enter__()
+    multiprocessing.util.Finalize(_worker_scraper, _worker_scraper.__exit__, args=(None, None, None), exitpriority=10)
+    # Pool.terminate() sends SIGTERM, which skips finalizers; quit the browser first
+    signal.signal(signal.SIGTERM, _quit_worker)
+
+def _quit_worker(signum, frame) -> None:
+    """Quit this worker's browser when the pool terminates it, then exit."""
+    try:
+        if _worker_scraper is not None and _worker_scraper.driver:
+            _worker_scraper.driver.quit()
+    finally:
+        os._exit(0)
+
+def scrape_one_category(category: Dict[str, str], task_id: int) -> Tuple[Dict[str, str], List[Dict]]:
+    """Scrape a single category inside a pool worker."""
+    # Lets the parent notice if this process dies before returning a result
+    _task_starts.put((task_id, os.getpid()))
+    logging.info(f"Fetching products from category: {category['name']}")
+    try:
+        products = list(_worker_scraper.scrape_products(category["url"], category["name"]))
+    except Exception as e:
+        logging.error(f"Error scraping category {category['name']}: {e}")
+        products = []
+    time.sleep(_worker_scraper.config.page_load_delay)
+    return category, products
+
+def scrape_categories(pool: multiprocessing.pool.Pool, categories: List[Dict[str, str]],
+                      max_pending: int, task_starts: multiprocessing.Queue) -> Iterator[Tuple[Dict[str, str], List[Dict]]]:
+    """Yield (category, products) as workers finish, keeping at most max_pending categories outstanding."""
+    results = queue.Queue()
+    remaining = enumerate(categories)
+    # task_id -> (category, AsyncResult), for categories the caller hasn't processed yet
+    pending: Dict[int, Tuple[Dict[str, str], multiprocessing.pool.AsyncResult]] = {}
+    # task_id -> pid of the worker that picked the category up
+    running: Dict[int, int] = {}
+    lost = 0
+    while True:
+        # A category stays outstanding until the caller has processed its products
+        while len(pending) < max_pending:
+            task_id, category = next(remaining, (None, None))
+            if category is None:
+                break
+            async_result = pool.apply_async(
+                scrape_one_category, (category, task_id),
+                callback=functools.partial(_category_done, results, task_id),
+                error_callback=functools.partial(_category_failed, results, task_id, category)
+            )
+            pending[task_id] = (category, async_result)
+        if not pending:
+            break
+
+        try:
+            task_id, (category, products) = results.get(timeout=LOST_TASK_POLL)
+        except queue.Empty:
+            # Pool replaces a worker that dies mid-task but never reports the task, so look for it
+            task_id = _find_lost_task(pending, running, task_starts)
+            if task_id is None:
+                continue
+            category, products = pending[task_id][0], []
+            logging.error(f"Worker {running[task_id]} died while scraping category {category['name']}")
+            lost += 1
+
+        del pending[task_id]
+        running.pop(task_id, None)
+        yield category, products
+
+    if lost:
+        # A lost task never leaves the pool's cache, so close()/join() would wait on it forever;
+        # everything else is done, and workers quit their browsers on SIGTERM
+        logging.warning(f"{lost} categories were lost to dead workers, terminating the pool")
+        pool.terminate()
+
+def _category_done(results: queue.Queue, task_id: int, result: Tuple[Dict[str, str], List[Dict]]) -> None:
+    results.put((task_id, result))
+
+def _category_failed(results: queue.Queue, task_id: int, category: Dict[str, str], error: BaseException) -> None:
+    logging.error(f"Worker failed scraping category {category['name']}: {error}")
+    results.put((task_id, (category, [])))
+
+def _find_lost_task(pending: Dict[int, Tuple[Dict[str, str], multiprocessing.pool.AsyncResult]],
+                    running: Dict[int, int], task_starts: multiprocessing.Queue) -> Optional[int]:
+    """Return a pending task whose worker process has exited without a result, if any."""
+    while True:
+        try:
+            task_id, pid = task_starts.get_nowait()
+        except queue.Empty:
+            break
+        running[task_id] = pid
+    for task_id, pid in running.items():
+        if task_id in pending and not pending[task_id][1].ready() and not _pid_alive(pid):
+            return task_id
+    return None
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
 def main():
     config = ScraperConfig(
         base_url="https://www.woolworths.co.nz/shop/browse",
-        page_load_delay=int(os.environ.get("PAGE_LOAD_DELAY", 7)),
-        product_log_delay=float(os.environ.get("PRODUCT_LOG_DELAY", 0.02))
+        page_load_delay=int(os.environ.get("PAGE_LOAD_DELAY", 1)),
+        fetch_product_details=os.environ.get("FETCH_PRODUCT_DETAILS", "0") == "1"
     )
 
-    filename = f"woolworths_products_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
-    
-    with open(filename, 'w') as outfile:
-        logging.info(f"Opened file {filename} for writing.")
-        with WoolworthsScraper(config) as scraper:
-            # Fetch categories
-            categories = scraper.fetch_categories()
-            if not categories:
-                logging.error("No categories found to process")
-                return
+    with WoolworthsScraper(config) as scraper:
+        # Fetch categories
+        categories = scraper.fetch_categories()
+    if not categories:
+        logging.error("No categories found to process")
+        return
+
+    filename = f"woolworths_products_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.jsonl"
+
+    # Each worker process owns its own browser; start them before any client threads exist
+    task_starts = multiprocessing.Queue()
+    pool = multiprocessing.Pool(SCRAPER_WORKERS, initializer=_init_worker, initargs=(config, task_starts))
+    try:
+        with open(filename, 'wb', buffering=1 << 20) as outfile, PriceCache(PRICE_CACHE_PATH) as price_cache, \
+                FrappeClient() as frappe, \
+                FrappeUploader(frappe, on_written=functools.partial(record_prices, price_cache)) as uploader:
+            logging.info(f"Opened file {filename} for writing.")
+            # Frappe writes run on the uploader thread, overlapping with scraping
+            for category, products in scrape_categories(pool, categories, MAX_PENDING_CATEGORIES, task_starts):
+                for product in products:
+                    try:
+                        # Write product to file
+                        outfile.write(orjson.dumps(product) + b'\n')
+                        logging.info(f"Written product to file: {product['name']}")
+                        
+                        # Skip the Frappe write when the price hasn't moved since the last run
+                        if price_cache.is_unchanged(product['id'], product.get('currentPrice')):
+                            logging.info(f"Price unchanged, skipping Frappe update: {product['name']}")
+                            continue
+
+                        uploader.put(to_frappe_product(product))
+                    except Exception as e:
+                        logging.error(f"Error processing product {product['name']}: {e}")
+
+                # Push each finished category to disk so a crash keeps everything written so far
+                outfile.flush()
 
-            for category in categories:
-                logging.info(f"Fetching products from category: {category['name']}")
-                products = scraper.scrape_products(category["url"])
-                logging.debug(f"Products fetched: {products}")  # Log the fetched products
                 if products:
                     logging.info(f"Found {len(products)} products in category {category['name']}")
-                    for product in products:
-                        try:
-                            # Write product to file
-                            json.dump(product, outfile)
-                            outfile.write('\n')  # Write a newline for each product
-                            logging.info(f"Written product to file: {product['name']}")
-                            
-                            # Send each product to Frappe immediately after scraping
-                            test_write_to_frappe(product)
-                            logging.info(f"Successfully sent product to Frappe: {product['name']}")
-                        except Exception as e:
-                            logging.error(f"Error processing product {product['name']}: {e}")
                 else:
                     logging.warning(f"No products found in category: {category['name']}")
-                time.sleep(config.page_load_delay)
+    except BaseException:
+        # Don't wait for the remaining categories; workers quit their browsers on SIGTERM
+        pool.terminate()
+        raise
+    else:
+        # close/join (not terminate) so each worker runs its finalizer and quits Chrome
+        pool.close()
+    finally:
+        pool.join()
 
     logging.info(f"Successfully wrote products to {filename} and sent them to Frappe.")
 